@@ -1,10 +1,9 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
-from matplotlib.backends.backend_pdf import PdfPages
 import pandas as pd
+import numpy as np
+import altair as alt
+import csv
 import io
-import streamlit as st
 import os
 import base64
 
@@ -13,10 +12,18 @@ import base64
 # --------------------
 logo_path = os.path.join(os.path.dirname(__file__), "logo.png")
 
-if os.path.exists(logo_path):
-    with open(logo_path, "rb") as f:
-        logo_base64 = base64.b64encode(f.read()).decode()
 
+@st.cache_resource
+def load_logo_base64(path):
+    """Base64-encoded logo, read from disk once per server process."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
+logo_base64 = load_logo_base64(logo_path)
+if logo_base64:
     st.markdown(
         f"""
         <div style="text-align: center; margin-bottom: 20px;">
@@ -77,29 +84,31 @@ You can download the process timeline as a .csv or download a pdf report of the
 if st.button("Clear Chart & Results"):
     st.session_state.clear = True
 
-# Lookup table
-lookup_table = pd.DataFrame([
-    {"Pipe Size": 16, "DR": 7,  "Weld start": 13.3,  "Cooling": 24},
-    {"Pipe Size": 16, "DR": 9,  "Weld start": 37.24, "Cooling": 20},
-    {"Pipe Size": 16, "DR": 11, "Weld start": 9.31,  "Cooling": 16},
-    {"Pipe Size": 16, "DR": 13, "Weld start": 6.65,  "Cooling": 13},
-    {"Pipe Size": 18, "DR": 7,  "Weld start": 1.33,  "Cooling": 27},
-    {"Pipe Size": 18, "DR": 9,  "Weld start": 11.97, "Cooling": 22},
-    {"Pipe Size": 18, "DR": 11, "Weld start": 9.31,  "Cooling": 20},
-    {"Pipe Size": 18, "DR": 13, "Weld start": 7.98,  "Cooling": 15},
-    {"Pipe Size": 20, "DR": 7,  "Weld start": 15.96, "Cooling": 30},
-    {"Pipe Size": 20, "DR": 9,  "Weld start": 13.3,  "Cooling": 24},
-    {"Pipe Size": 20, "DR": 11, "Weld start": 10.64, "Cooling": 20},
-    {"Pipe Size": 20, "DR": 13, "Weld start": 9.31,  "Cooling": 16},
-    {"Pipe Size": 24, "DR": 7,  "Weld start": 19.95, "Cooling": 36},
-    {"Pipe Size": 24, "DR": 9,  "Weld start": 15.96, "Cooling": 29},
-    {"Pipe Size": 24, "DR": 11, "Weld start": 13.3,  "Cooling": 24},
-    {"Pipe Size": 24, "DR": 13, "Weld start": 10.64, "Cooling": 20},
-    {"Pipe Size": 30, "DR": 7,  "Weld start": 19.95, "Cooling": 32},
-    {"Pipe Size": 30, "DR": 9,  "Weld start": 15.96, "Cooling": 30},
-    {"Pipe Size": 30, "DR": 11, "Weld start": 13.3,  "Cooling": 24},
-    {"Pipe Size": 30, "DR": 17, "Weld start": 10.64, "Cooling": 19},
-])
+# Lookup table: (pipe size, DR) -> (weld start, cooling) minutes
+lookup_table = {
+    (16, 7):  (13.3,  24.0),
+    (16, 9):  (37.24, 20.0),
+    (16, 11): (9.31,  16.0),
+    (16, 13): (6.65,  13.0),
+    (18, 7):  (1.33,  27.0),
+    (18, 9):  (11.97, 22.0),
+    (18, 11): (9.31,  20.0),
+    (18, 13): (7.98,  15.0),
+    (20, 7):  (15.96, 30.0),
+    (20, 9):  (13.3,  24.0),
+    (20, 11): (10.64, 20.0),
+    (20, 13): (9.31,  16.0),
+    (24, 7):  (19.95, 36.0),
+    (24, 9):  (15.96, 29.0),
+    (24, 11): (13.3,  24.0),
+    (24, 13): (10.64, 20.0),
+    (30, 7):  (19.95, 32.0),
+    (30, 9):  (15.96, 30.0),
+    (30, 11): (13.3,  24.0),
+    (30, 17): (10.64, 19.0),
+}
+pipe_sizes = (16, 18, 20, 24, 30)
+dr_values = (7, 9, 11, 13, 17)
 
 # --- Global Inputs ---
 st.header("Global Step Durations")
@@ -113,143 +122,341 @@ with col2:
 st.header("🛠️ Machine Configurations")
 machines = []
 
-for i in range(1, 5):
-    with st.expander(f"Machine {i}"):
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            start_time = st.number_input(f"Start time (min)", min_value=0, value=(i - 1) * global_setup, key=f"start_{i}")
-        with c2:
-            number_of_welds = st.selectbox(f"Welds per elbow", options=[1, 2, 3, 4], index=1, key=f"welds_{i}")
-        with c3:
-            quantity = st.number_input(f"Number of elbows", min_value=1, value=3, key=f"qty_{i}")
-
-        c4, c5 = st.columns(2)
-        with c4:
-            pipe_size = st.selectbox(f"Pipe Size", sorted(lookup_table["Pipe Size"].unique()), key=f"pipe_{i}")
-        with c5:
-            dr = st.selectbox(f"DR", sorted(lookup_table["DR"].unique()), key=f"dr_{i}")
-
-        match = lookup_table[(lookup_table["Pipe Size"] == pipe_size) & (lookup_table["DR"] == dr)]
-        if match.empty:
-            st.warning(f"No match found for Pipe Size {pipe_size} and DR {dr}. Using default values.")
-            weld_start = 10
-            cooling = 10
-        else:
-            weld_start = float(match["Weld start"].values[0])
-            cooling = float(match["Cooling"].values[0])
-
-        machines.append({
-            "start_time": start_time,
-            "number_of_welds": number_of_welds,
-            "quantity": quantity,
-            "step_durations": [global_setup, weld_start, global_stamping, cooling]
-        })
+# Inputs are batched in a form so editing several fields triggers one rerun, on submit
+with st.form("machine_form"):
+    for i in range(1, 5):
+        with st.expander(f"Machine {i}"):
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                start_time = st.number_input(f"Start time (min)", min_value=0, value=(i - 1) * global_setup, key=f"start_{i}")
+            with c2:
+                number_of_welds = st.selectbox(f"Welds per elbow", options=[1, 2, 3, 4], index=1, key=f"welds_{i}")
+            with c3:
+                quantity = st.number_input(f"Number of elbows", min_value=1, value=3, key=f"qty_{i}")
+
+            c4, c5 = st.columns(2)
+            with c4:
+                pipe_size = st.selectbox(f"Pipe Size", pipe_sizes, key=f"pipe_{i}")
+            with c5:
+                dr = st.selectbox(f"DR", dr_values, key=f"dr_{i}")
+
+            match = lookup_table.get((pipe_size, dr))
+            if match is None:
+                st.warning(f"No match found for Pipe Size {pipe_size} and DR {dr}. Using default values.")
+                weld_start = 10
+                cooling = 10
+            else:
+                weld_start, cooling = match
+
+            machines.append({
+                "start_time": start_time,
+                "number_of_welds": number_of_welds,
+                "quantity": quantity,
+                "step_durations": [global_setup, weld_start, global_stamping, cooling]
+            })
 
-# --- Generate Chart ---
-if st.button("📊 Generate Process Timeline Report"):
-    st.session_state.clear = False  # reset clear flag
-    fig, ax = plt.subplots(figsize=(16, 8), dpi=150)
+    generate = st.form_submit_button("📊 Generate Process Timeline Report")
+
+# --- Schedule ---
+step_labels = ["Set up", "Weld start", "Stamping", "Cooling"]
+step_colors = ["orange", "grey", "yellow", "lightblue"]
+overlap_types = ("Setup vs Setup", "Setup vs Stamping", "Stamping vs Stamping")
+# Schedule arithmetic runs on integer hundredths of a minute, the finest step in the lookup table
+time_scale = 100
+
+
+@st.cache_data
+def build_schedule(machine_configs):
+    """Lay out every step on every machine and find overlapping operator steps.
+
+    ``machine_configs`` holds one ``(start_time, number_of_welds, quantity, step_durations)``
+    tuple per machine so the inputs can be hashed for caching.
+    """
     overlap_regions = []
     all_setup_intervals = []
     all_stamping_intervals = []
-    timeline_records = []
     machine_run_times = []
-    machine_overlap_counts = {f"Machine {i+1}": 0 for i in range(4)}
-
-    step_labels = ["Set up", "Weld start", "Stamping", "Cooling"]
-    step_colors = ["orange", "grey", "yellow", "lightblue"]
-
-    for idx, machine in enumerate(machines):
-        current_time = machine["start_time"]
-        durations = machine["step_durations"]
-        machine_start_time = current_time
-
-        for q in range(machine["quantity"]):
-            for w in range(machine["number_of_welds"]):
-                for step_idx in range(4):
-                    start = current_time
-                    duration = durations[step_idx]
-                    end = start + duration
-                    label = step_labels[step_idx]
-
-                    if label == "Set up":
-                        all_setup_intervals.append((start, end, idx + 1))
-                    elif label == "Stamping":
-                        all_stamping_intervals.append((start, end, idx + 1))
-
-                    ax.barh(y=idx, width=duration, left=start,
-                            color=step_colors[step_idx], edgecolor='black')
-
-                    timeline_records.append({
-                        "Machine": f"Machine {idx + 1}",
-                        "Elbow #": q + 1,
-                        "Weld #": w + 1,
-                        "Step": label,
-                        "Start Time": round(start, 2),
-                        "End Time": round(end, 2),
-                        "Duration": round(duration, 2)
-                    })
-                    current_time = end
-
-        machine_run_times.append((f"Machine {idx + 1}", round(current_time - machine_start_time, 2)))
-
-    # Overlap detection (setup vs setup, stamping vs stamping, setup vs stamping)
-    all_intervals = all_setup_intervals + all_stamping_intervals
-    for i1, (s_start, s_end, s_machine) in enumerate(all_intervals):
-        for i2, (t_start, t_end, t_machine) in enumerate(all_intervals):
-            if i1 < i2 and s_machine != t_machine:
-                if not (s_end <= t_start or s_start >= t_end):
-                    overlap_start = max(s_start, t_start)
-                    overlap_end = min(s_end, t_end)
-                    overlap_regions.append((overlap_start, overlap_end, s_machine - 1))
-                    overlap_regions.append((overlap_start, overlap_end, t_machine - 1))
-                    machine_overlap_counts[f"Machine {s_machine}"] += 1
-                    machine_overlap_counts[f"Machine {t_machine}"] += 1
-
-    for start, end, machine_idx in overlap_regions:
-        ax.barh(y=machine_idx, width=end - start, left=start,
-                height=0.8, color='red', alpha=0.3,
-                edgecolor='red', linewidth=0.5)
-
-    ax.set_yticks(range(4))
-    ax.set_yticklabels([f"Machine {i + 1}" for i in range(4)], fontsize=12)
-    ax.set_xlabel("Time (minutes)", fontsize=12)
-    ax.set_title("Weld Process Timeline", fontsize=16, weight="bold")
-    ax.grid(True, which='both', axis='x', linestyle='--', alpha=0.5)
-    ax.xaxis.set_major_locator(plt.MultipleLocator(50))
-    ax.xaxis.set_minor_locator(plt.MultipleLocator(10))
-
-    legend_elements = [
-        Patch(facecolor="orange", edgecolor='black', label="Set up"),
-        Patch(facecolor="grey", edgecolor='black', label="Weld start"),
-        Patch(facecolor="yellow", edgecolor='black', label="Stamping"),
-        Patch(facecolor="lightblue", edgecolor='black', label="Cooling"),
-        Patch(facecolor="red", edgecolor='red', alpha=0.3, label="Overlap")
-    ]
-    ax.legend(handles=legend_elements, loc="upper right")
-
-    st.pyplot(fig)
+    bar_segments = {}
+
+    # Timeline columns, filled one machine slice at a time
+    total_rows = sum(4 * quantity * number_of_welds for _, number_of_welds, quantity, _ in machine_configs)
+    machine_col = np.empty(total_rows, dtype=np.int8)
+    elbow_col = np.empty(total_rows, dtype=np.int64)
+    weld_col = np.empty(total_rows, dtype=np.int64)
+    step_col = np.empty(total_rows, dtype=np.int8)
+    start_col = np.empty(total_rows, dtype=np.int64)
+    end_col = np.empty(total_rows, dtype=np.int64)
+    duration_col = np.empty(total_rows, dtype=np.int64)
+    row = 0
+
+    for idx, (machine_start_time, number_of_welds, quantity, durations) in enumerate(machine_configs):
+        # Step boundaries are one running sum of whole hundredths, so they carry no float drift
+        cycles = quantity * number_of_welds
+        scaled_durations = np.rint(np.asarray(durations, dtype=np.float64) * time_scale).astype(np.int64)
+        step_durations = np.tile(scaled_durations, cycles)
+        boundaries = np.cumsum(np.concatenate(([round(machine_start_time * time_scale)], step_durations)))
+        step_starts, step_ends = boundaries[:-1], boundaries[1:]
+        step_ids = np.tile(np.arange(4), cycles)
+
+        for step_idx in range(4):
+            in_step = step_ids == step_idx
+            starts, ends = step_starts[in_step].tolist(), step_ends[in_step].tolist()
+            if step_labels[step_idx] == "Set up":
+                all_setup_intervals.extend((start, end, idx + 1) for start, end in zip(starts, ends))
+            elif step_labels[step_idx] == "Stamping":
+                all_stamping_intervals.extend((start, end, idx + 1) for start, end in zip(starts, ends))
+            bar_segments[(idx, step_idx)] = list(zip((step_starts[in_step] / time_scale).tolist(),
+                                                     (step_durations[in_step] / time_scale).tolist()))
+
+        rows = slice(row, row + 4 * cycles)
+        machine_col[rows] = idx
+        elbow_col[rows] = np.repeat(np.arange(1, quantity + 1), number_of_welds * 4)
+        weld_col[rows] = np.tile(np.repeat(np.arange(1, number_of_welds + 1), 4), quantity)
+        step_col[rows] = step_ids
+        start_col[rows] = step_starts
+        end_col[rows] = step_ends
+        duration_col[rows] = step_durations
+        row = rows.stop
+
+        machine_run_times.append((f"Machine {idx + 1}", int(boundaries[-1] - boundaries[0]) / time_scale))
+
+    timeline_df = pd.DataFrame({
+        "Machine": pd.Categorical.from_codes(machine_col, categories=[f"Machine {i + 1}" for i in range(4)]),
+        "Elbow #": elbow_col,
+        "Weld #": weld_col,
+        "Step": pd.Categorical.from_codes(step_col, categories=step_labels),
+        "Start Time": start_col / time_scale,
+        "End Time": end_col / time_scale,
+        "Duration": duration_col / time_scale,
+    })
+
+    # Overlap detection (setup vs setup, stamping vs stamping, setup vs stamping).
+    # With intervals sorted by start, interval i can only overlap the later intervals that
+    # start before it ends: the window (i, searchsorted(starts, end_i)). Every step lasts
+    # at least a minute, so each window holds exactly the intervals overlapping interval i.
+    all_intervals = ([(start, end, machine, 0) for start, end, machine in all_setup_intervals]
+                     + [(start, end, machine, 1) for start, end, machine in all_stamping_intervals])
+    intervals = np.asarray(all_intervals, dtype=np.int64).reshape(-1, 4)
+    intervals = intervals[np.argsort(intervals[:, 0], kind="stable")]
+    starts, ends = intervals[:, 0], intervals[:, 1]
+    owners, kinds = intervals[:, 2], intervals[:, 3]
+
+    window_sizes = np.searchsorted(starts, ends, side="left") - np.arange(len(starts)) - 1
+    i1 = np.repeat(np.arange(len(starts)), window_sizes)
+    window_offsets = np.arange(len(i1)) - np.repeat(np.cumsum(window_sizes) - window_sizes, window_sizes)
+    i2 = i1 + 1 + window_offsets
+    cross_machine = owners[i1] != owners[i2]
+    i1, i2 = i1[cross_machine], i2[cross_machine]
+
+    overlap_starts = starts[i2] / time_scale
+    overlap_ends = np.minimum(ends[i1], ends[i2]) / time_scale
+    for overlap_start, overlap_end, s_machine, t_machine in zip(
+        overlap_starts.tolist(), overlap_ends.tolist(), owners[i1].tolist(), owners[i2].tolist()
+    ):
+        overlap_regions.append((overlap_start, overlap_end, s_machine - 1))
+        overlap_regions.append((overlap_start, overlap_end, t_machine - 1))
+
+    overlap_counts = np.bincount(owners[i1], minlength=5) + np.bincount(owners[i2], minlength=5)
+    machine_overlap_counts = {f"Machine {m}": int(overlap_counts[m]) for m in range(1, 5)}
+
+    # --- Overlap Type Tracking ---
+    # The kind sum indexes the type: 0 = both setups, 1 = mixed, 2 = both stampings
+    type_totals = np.bincount(kinds[i1] + kinds[i2], weights=overlap_ends - overlap_starts, minlength=3)
+    overlap_type_durations = dict(zip(overlap_types, type_totals.tolist()))
+
+    return (timeline_df, machine_run_times, bar_segments,
+            overlap_regions, machine_overlap_counts, overlap_type_durations)
+
+
+@st.cache_data
+def timeline_csv(machine_configs):
+    """Timeline CSV export, encoded once per schedule."""
+    timeline_df = build_schedule(machine_configs)[0]
+    # Plain csv rows straight from the columns; skips the pandas CSV formatter
+    csv_buffer = io.StringIO()
+    writer = csv.writer(csv_buffer, lineterminator=os.linesep)
+    writer.writerow(timeline_df.columns)
+    writer.writerows(zip(*(timeline_df[column].tolist() for column in timeline_df.columns)))
+    return csv_buffer.getvalue().encode("utf-8")
+
+
+@st.cache_resource
+def legend_handles():
+    """Legend proxy patches for the PDF timeline, shared across reports.
+
+    Legends only copy style from these proxies, so one set can back every figure.
+    """
+    from matplotlib.patches import Patch
+
+    handles = [Patch(facecolor=color, edgecolor='black', label=label)
+               for label, color in zip(step_labels, step_colors)]
+    handles.append(Patch(facecolor="red", edgecolor='red', alpha=0.3, label="Overlap"))
+    return handles
+
+
+@st.cache_data
+def build_pdf_report(machine_configs, utilization_percent, letter_grade, color):
+    """Timeline chart and summary report as PDF bytes.
+
+    The 300 DPI save is the slowest step of the report, so the bytes are cached on the
+    schedule inputs rather than regenerated every time the report section reruns.
+    """
+    # matplotlib is only used for this export, so app start-up doesn't pay for importing it;
+    # figures are built without pyplot so none stay registered in its global state
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import MultipleLocator
+    from matplotlib.patches import Rectangle
+    from matplotlib.collections import PatchCollection
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    (_, machine_run_times, bar_segments,
+     overlap_regions, machine_overlap_counts, overlap_type_durations) = build_schedule(machine_configs)
+    has_overlap = any(count > 0 for count in machine_overlap_counts.values())
+    total_runtime_all = sum(runtime for _, runtime in machine_run_times)
+
+    pdf_buffer = io.BytesIO()
+    with PdfPages(pdf_buffer) as pdf:
+        # Page 1: Chart
+        fig = Figure(figsize=(16, 8))
+        ax = fig.subplots()
+
+        # Past roughly a thousand bars a 300 DPI raster of the bar layer is smaller than the
+        # vector rectangles; axes, grid and text stay vector either way
+        rasterize_bars = sum(len(segments) for segments in bar_segments.values()) > 1000
+
+        # One broken_barh per (machine, step) instead of one barh per step
+        for (machine_idx, step_idx), segments in bar_segments.items():
+            ax.broken_barh(segments, (machine_idx - 0.4, 0.8),
+                           facecolors=step_colors[step_idx], edgecolor='black',
+                           rasterized=rasterize_bars)
+
+        overlap_patches = [Rectangle((start, machine_idx - 0.4), end - start, 0.8)
+                           for start, end, machine_idx in overlap_regions]
+        ax.add_collection(PatchCollection(overlap_patches, facecolor='red', alpha=0.3,
+                                          edgecolor='red', linewidth=0.5,
+                                          rasterized=rasterize_bars))
+        ax.set_xlim(left=min(start_time for start_time, _, _, _ in machine_configs))
+
+        ax.set_yticks(range(4))
+        ax.set_yticklabels([f"Machine {i + 1}" for i in range(4)], fontsize=12)
+        ax.set_xlabel("Time (minutes)", fontsize=12)
+        ax.set_title("Weld Process Timeline", fontsize=16, weight="bold")
+        ax.grid(True, which='both', axis='x', linestyle='--', alpha=0.5)
+        ax.xaxis.set_major_locator(MultipleLocator(50))
+        ax.xaxis.set_minor_locator(MultipleLocator(10))
+
+        ax.legend(handles=legend_handles(), loc="upper right")
+
+        pdf.savefig(fig, dpi=300, bbox_inches='tight')
+
+        # Page 2: Report
+        fig2 = Figure(figsize=(8.5, 11))
+        ax2 = fig2.subplots()
+        ax2.axis("off")
+
+        y = 1.0
+        ax2.text(0.05, y, "Weld Process Report", fontsize=16, weight="bold", transform=ax2.transAxes)
+        y -= 0.1
+
+        ax2.text(0.05, y, "⏱️ Total Run Time Per Machine", fontsize=14, weight="bold", transform=ax2.transAxes)
+        y -= 0.05
+        for name, runtime in machine_run_times:
+            ax2.text(0.1, y, f"{name}: {runtime:.2f} minutes", fontsize=12, transform=ax2.transAxes)
+            y -= 0.04
+
+        y -= 0.05
+        ax2.text(0.05, y, "📊 Overlap Report", fontsize=14, weight="bold", transform=ax2.transAxes)
+        y -= 0.05
+        if has_overlap:
+            for machine, count in machine_overlap_counts.items():
+                runtime = dict(machine_run_times)[machine]
+                percentage = (count / runtime) * 100 if runtime > 0 else 0
+                ax2.text(0.1, y, f"{machine}: {count} overlaps ({percentage:.1f}% of runtime)", fontsize=12, transform=ax2.transAxes)
+                y -= 0.04
+        else:
+            ax2.text(0.1, y, "✅ No overlaps detected", fontsize=12, transform=ax2.transAxes)
+            y -= 0.04
+
+        # --- Add Overlap Breakdown by Type ---
+        y -= 0.05
+        ax2.text(0.05, y, "🔎 Overlap Breakdown by Type", fontsize=14, weight="bold", transform=ax2.transAxes)
+        y -= 0.05
+        for o_type, duration in overlap_type_durations.items():
+            percentage = (duration / total_runtime_all) * 100 if total_runtime_all > 0 else 0
+            ax2.text(0.1, y, f"{o_type}: {duration:.2f} min ({percentage:.2f}% of total runtime)", fontsize=12, transform=ax2.transAxes)
+            y -= 0.04
+
+        # --- Add Machine Utilization Grade ---
+        y -= 0.05
+        ax2.text(0.05, y, "⚙️ Machine Utilization", fontsize=14, weight="bold", transform=ax2.transAxes)
+        y -= 0.05
+        ax2.text(0.1, y, f"Utilization: {utilization_percent:.2f}% (Grade {letter_grade})", fontsize=12, color=color, transform=ax2.transAxes)
+        y -= 0.04
+
+        pdf.savefig(fig2, dpi=300, bbox_inches='tight')
+
+    return pdf_buffer.getvalue()
+
+
+# --- Generate Chart ---
+@st.fragment
+def render_report(machines):
+    """Results and downloads for the submitted machine settings.
+
+    Runs as a fragment so clicking a download button reruns only this section, not the
+    logo, lookups and machine inputs above it.
+    """
+    machine_configs = tuple(
+        (m["start_time"], m["number_of_welds"], m["quantity"], tuple(m["step_durations"]))
+        for m in machines
+    )
+    (df, machine_run_times, bar_segments,
+     overlap_regions, machine_overlap_counts, overlap_type_durations) = build_schedule(machine_configs)
+
+    overlap_df = pd.DataFrame(
+        [(f"Machine {machine_idx + 1}", "Overlap", start, end) for start, end, machine_idx in overlap_regions],
+        columns=["Machine", "Step", "Start Time", "End Time"],
+    )
+
+    # Vega-Lite renders the bars in the browser, so reruns skip the server-side raster
+    step_scale = alt.Scale(domain=step_labels + ["Overlap"], range=step_colors + ["red"])
+    machine_axis = alt.Y("Machine:N", title=None, sort=[f"Machine {i + 1}" for i in range(4)])
+    time_axis = alt.X("Start Time:Q", title="Time (minutes)")
+    step_bars = alt.Chart(df).mark_bar(stroke="black", strokeWidth=0.5).encode(
+        x=time_axis,
+        x2="End Time:Q",
+        y=machine_axis,
+        color=alt.Color("Step:N", scale=step_scale, title=None),
+        tooltip=["Machine", "Elbow #", "Weld #", "Step", "Start Time", "End Time", "Duration"],
+    )
+    overlap_bars = alt.Chart(overlap_df).mark_bar(opacity=0.3, stroke="red", strokeWidth=0.5).encode(
+        x=time_axis,
+        x2="End Time:Q",
+        y=machine_axis,
+        color=alt.Color("Step:N", scale=step_scale, title=None),
+    )
+    # Zoom and pan along the time axis happen client-side, without a Streamlit rerun
+    chart = (step_bars + overlap_bars).properties(title="Weld Process Timeline", height=400).interactive(bind_y=False)
+    st.altair_chart(chart, width="stretch")
 
     # Results
     st.subheader("⏱️ Total Run Time Per Machine")
+    # One markdown block per list instead of one st.write element per line
+    runtime_lines = []
     for name, runtime_min in machine_run_times:
         runtime_hr = runtime_min / 60
-        st.write(f"**{name}**: {runtime_min:.2f} min ({runtime_hr:.2f} hr)")
+        runtime_lines.append(f"**{name}**: {runtime_min:.2f} min ({runtime_hr:.2f} hr)")
+    st.markdown("\n\n".join(runtime_lines))
 
     # --- Downtime Report ---
     st.subheader("⏳ Downtime Report")
 
-    if timeline_records:
+    if not df.empty:
         # Find the maximum end time across all machines
-        max_end_time = max([rec["End Time"] for rec in timeline_records])
+        max_end_time = df["End Time"].max()
 
         # Calculate final end time per machine
-        machine_end_times = {}
-        for rec in timeline_records:
-            machine = rec["Machine"]
-            end_time = rec["End Time"]
-            if machine not in machine_end_times or end_time > machine_end_times[machine]:
-                machine_end_times[machine] = end_time
+        machine_end_times = df.groupby("Machine", observed=True)["End Time"].max()
 
         # Build downtime data
         downtime_data = []
@@ -270,45 +477,24 @@ if st.button("📊 Generate Process Timeline Report"):
         # Show total downtime
         downtime_hr = total_downtime / 60
         max_end_time_hr = max_end_time / 60
-        st.write(f"**Total Downtime:** {total_downtime:.2f} mins ({downtime_hr:.2f} hr)")
-        st.write(f"**Maximum Process Time:** {max_end_time:.2f} mins ({max_end_time_hr:.2f} hr)")
+        st.markdown(f"**Total Downtime:** {total_downtime:.2f} mins ({downtime_hr:.2f} hr)\n\n"
+                    f"**Maximum Process Time:** {max_end_time:.2f} mins ({max_end_time_hr:.2f} hr)")
     else:
         st.info("No timeline records available to calculate downtime.")
 
     st.subheader("📊 Overlap Count Per Machine")
     has_overlap = any(count > 0 for count in machine_overlap_counts.values())
     if has_overlap:
+        run_time_by_machine = dict(machine_run_times)
+        overlap_lines = []
         for machine, count in machine_overlap_counts.items():
-            runtime = dict(machine_run_times)[machine]
+            runtime = run_time_by_machine[machine]
             percentage = (count / runtime) * 100 if runtime > 0 else 0
-            st.write(f"**{machine}**: {count} overlaps ({percentage:.1f}% of runtime)")
+            overlap_lines.append(f"**{machine}**: {count} overlaps ({percentage:.1f}% of runtime)")
+        st.markdown("\n\n".join(overlap_lines))
     else:
         st.success("✅ No overlaps detected")
 
-    # --- Overlap Type Tracking ---
-    overlap_type_durations = {
-        "Setup vs Setup": 0,
-        "Setup vs Stamping": 0,
-        "Stamping vs Stamping": 0
-    }
-
-    # Re-run detection with type classification
-    for i1, (s_start, s_end, s_machine) in enumerate(all_intervals):
-        s_type = "Setup" if (s_start, s_end, s_machine) in all_setup_intervals else "Stamping"
-        for i2, (t_start, t_end, t_machine) in enumerate(all_intervals):
-            if i1 < i2 and s_machine != t_machine:
-                if not (s_end <= t_start or s_start >= t_end):
-                    overlap_start = max(s_start, t_start)
-                    overlap_end = min(s_end, t_end)
-                    overlap_duration = overlap_end - overlap_start
-
-                    if s_type == "Setup" and (t_start, t_end, t_machine) in all_setup_intervals:
-                        overlap_type_durations["Setup vs Setup"] += overlap_duration
-                    elif s_type == "Stamping" and (t_start, t_end, t_machine) in all_stamping_intervals:
-                        overlap_type_durations["Stamping vs Stamping"] += overlap_duration
-                    else:
-                        overlap_type_durations["Setup vs Stamping"] += overlap_duration
-    
     # --- Summarize Overlap Types ---
     total_runtime_all = sum(runtime for _, runtime in machine_run_times)
     total_overlap_time = sum(overlap_type_durations.values())
@@ -325,7 +511,7 @@ if st.button("📊 Generate Process Timeline Report"):
 
     df_overlap = pd.DataFrame(overlap_table)
     st.table(df_overlap)
-    
+
     # --- Updated Machine Utilization Grade ---
     # total_overlap_time is already computed earlier in your overlap section
     if max_end_time > 0:
@@ -363,78 +549,20 @@ if st.button("📊 Generate Process Timeline Report"):
     """,
     unsafe_allow_html=True
     )
-    
-    # --- Downloads ---
-    df = pd.DataFrame(timeline_records)
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("📤 Export Timeline as CSV", data=csv, file_name="weld_timeline.csv", mime="text/csv")
-
-    pdf_buffer = io.BytesIO()
-    with PdfPages(pdf_buffer) as pdf:
-        # Page 1: Chart
-        fig.set_size_inches(16, 8)
-        pdf.savefig(fig, dpi=300, bbox_inches='tight')
-
-        # Page 2: Report
-        fig2, ax2 = plt.subplots(figsize=(8.5, 11))
-        ax2.axis("off")
-
-        y = 1.0
-        ax2.text(0.05, y, "Weld Process Report", fontsize=16, weight="bold", transform=ax2.transAxes)
-        y -= 0.1
-
-        ax2.text(0.05, y, "⏱️ Total Run Time Per Machine", fontsize=14, weight="bold", transform=ax2.transAxes)
-        y -= 0.05
-        for name, runtime in machine_run_times:
-            ax2.text(0.1, y, f"{name}: {runtime:.2f} minutes", fontsize=12, transform=ax2.transAxes)
-            y -= 0.04
-
-        y -= 0.05
-        ax2.text(0.05, y, "📊 Overlap Report", fontsize=14, weight="bold", transform=ax2.transAxes)
-        y -= 0.05
-        if has_overlap:
-            for machine, count in machine_overlap_counts.items():
-                runtime = dict(machine_run_times)[machine]
-                percentage = (count / runtime) * 100 if runtime > 0 else 0
-                ax2.text(0.1, y, f"{machine}: {count} overlaps ({percentage:.1f}% of runtime)", fontsize=12, transform=ax2.transAxes)
-                y -= 0.04
-        else:
-            ax2.text(0.1, y, "✅ No overlaps detected", fontsize=12, transform=ax2.transAxes)
-            y -= 0.04
 
-        # --- Add Overlap Breakdown by Type ---
-        y -= 0.05
-        ax2.text(0.05, y, "🔎 Overlap Breakdown by Type", fontsize=14, weight="bold", transform=ax2.transAxes)
-        y -= 0.05
-        for o_type, duration in overlap_type_durations.items():
-            percentage = (duration / total_runtime_all) * 100 if total_runtime_all > 0 else 0
-            ax2.text(0.1, y, f"{o_type}: {duration:.2f} min ({percentage:.2f}% of total runtime)", fontsize=12, transform=ax2.transAxes)
-            y -= 0.04
+    # --- Downloads ---
+    st.download_button("📤 Export Timeline as CSV", data=timeline_csv(machine_configs),
+                       file_name="weld_timeline.csv", mime="text/csv")
 
-        # --- Add Machine Utilization Grade ---
-        y -= 0.05
-        ax2.text(0.05, y, "⚙️ Machine Utilization", fontsize=14, weight="bold", transform=ax2.transAxes)
-        y -= 0.05
-        ax2.text(0.1, y, f"Utilization: {utilization_percent:.2f}% (Grade {letter_grade})", fontsize=12, color=color, transform=ax2.transAxes)
-        y -= 0.04
+    pdf_bytes = build_pdf_report(machine_configs, utilization_percent, letter_grade, color)
+    st.download_button("📥 Export Chart + Report as PDF", data=pdf_bytes,
+                       file_name="weld_report.pdf", mime="application/pdf")
 
-        pdf.savefig(fig2, dpi=300, bbox_inches='tight')
-        plt.close(fig2)
 
-    st.download_button("📥 Export Chart + Report as PDF", data=pdf_buffer.getvalue(),
-                       file_name="weld_report.pdf", mime="application/pdf")
+if generate:
+    st.session_state.clear = False  # reset clear flag
+    render_report(machines)
 
 # --- Clear Mode ---
 if st.session_state.clear:
     st.info("Chart and results cleared. Adjust inputs and click **Generate Chart** to start fresh.")
-
-
-
-
-
-
-
-
-
-
-